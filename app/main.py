@@ -1,17 +1,30 @@
 import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
 
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 
 from app.models.youtube import YouTubeURL
-from app.services.youtube_notes_service import generate_md_notes
+from app.services.ollama_service import CLIENT, warm_up
+from app.services.youtube_notes_service import generate_md_notes_stream
 from app.utils.logger_setup import logger
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await warm_up()
+    yield
+    await CLIENT.aclose()
+    logger.info("Closed Ollama HTTP client.")
+
+
 app = FastAPI(
     title="YouTube to Markdown Notes API",
     description="Generate structured Markdown notes from YouTube videos using transcription and summarization.",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
@@ -32,22 +45,27 @@ async def serve_index() -> FileResponse:
 @app.post("/generate-notes/", summary="Generate Markdown Notes")
 async def generate_notes(data: YouTubeURL, request: Request):
     """
-    Accepts a YouTube URL, processes the video, and returns the AI-generated notes as raw markdown.
+    Accepts a YouTube URL, processes the video, and streams the AI-generated notes as raw markdown.
     """
     logger.info(f"Received request to generate notes for URL: {data.url}")
 
     try:
-        md_notes = generate_md_notes(str(data.url))
+        md_stream = generate_md_notes_stream(str(data.url), data.language)
+
+        # Wait for the first chunk so that download, transcription and
+        # connection errors are still reported with a proper status code.
+        first_chunk = await anext(md_stream, None)
 
-        if not md_notes or not md_notes.strip():
+        if not first_chunk or not first_chunk.strip():
+            await md_stream.aclose()
             logger.warning(f"No notes generated for URL: {data.url}")
             raise HTTPException(status_code=500, detail="No notes generated")
 
-        logger.info(f"Successfully generated notes for URL: {data.url}")
-        return {
-            "youtube_url": data.url,
-            "md_notes": md_notes,
-        }
+        logger.info(f"Streaming notes for URL: {data.url}")
+        return StreamingResponse(
+            stream_notes(first_chunk, md_stream, str(data.url)),
+            media_type="text/markdown",
+        )
 
     except HTTPException as http_err:
         raise http_err
@@ -60,3 +78,22 @@ async def generate_notes(data: YouTubeURL, request: Request):
             status_code=500,
             content={"detail": "An internal error occurred while generating notes."},
         )
+
+
+async def stream_notes(
+    first_chunk: str, md_stream: AsyncIterator[str], url: str
+) -> AsyncIterator[str]:
+    """
+    Yields the already received first chunk followed by the rest of the notes.
+    """
+    yield first_chunk
+    try:
+        async for chunk in md_stream:
+            yield chunk
+        logger.info(f"Successfully generated notes for URL: {url}")
+    except Exception as e:
+        logger.error(
+            f"Notes stream interrupted for {url}: {e}",
+            exc_info=True,
+        )
+        raise
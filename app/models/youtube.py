@@ -1,5 +1,30 @@
-from pydantic import BaseModel, HttpUrl
+import re
+from typing import Optional
+
+from pydantic import BaseModel, Field, HttpUrl, field_validator
 
 
 class YouTubeURL(BaseModel):
     url: HttpUrl
+    language: Optional[str] = Field(
+        default=None,
+        description=(
+            "Language code of the video's audio, e.g. 'en' or 'en-US'. When given, "
+            "language detection is skipped. Only English is supported."
+        ),
+        examples=["en"],
+    )
+
+    @field_validator("language", mode="before")
+    @classmethod
+    def normalize_language(cls, value: Optional[str]) -> Optional[str]:
+        """Reduce the language tag to its lowercase primary subtag and reject non-English."""
+        if value is None:
+            return None
+        if not isinstance(value, str):
+            raise ValueError("Language must be a string.")
+
+        language = re.split(r"[-_]", value.strip().lower(), maxsplit=1)[0]
+        if language != "en":
+            raise ValueError("Only English ('en') is supported.")
+        return language
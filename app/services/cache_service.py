@@ -0,0 +1,184 @@
+import threading
+from collections import OrderedDict
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from app.utils.logger_setup import logger
+
+
+def get_video_id(youtube_url: str) -> str:
+    """Extract the canonical video ID from a YouTube URL.
+    Args:
+        youtube_url (str): The URL of the YouTube video.
+    Returns:
+        str: The video ID, or the stripped URL itself if no ID could be parsed.
+    """
+    parsed = urlparse(youtube_url.strip())
+    host = parsed.netloc.lower()
+
+    if host.endswith("youtu.be"):
+        video_id = parsed.path.lstrip("/").split("/")[0]
+    else:
+        video_id = parse_qs(parsed.query).get("v", [""])[0]
+        if not video_id:
+            parts = [part for part in parsed.path.split("/") if part]
+            if len(parts) >= 2 and parts[0] in ("embed", "shorts", "v", "live"):
+                video_id = parts[1]
+
+    return video_id or youtube_url.strip()
+
+
+class SemanticCache:
+    """Two-tier cache for generated markdown notes.
+
+    The exact tier maps a video ID to its notes. The semantic tier stores
+    normalized transcript embeddings and returns the notes of a previously
+    seen video whose transcript reaches the similarity threshold and whose
+    duration is close enough to the current one. Callers embed only the first
+    chapter of the transcript, so that the lookup can run before any notes
+    are generated; the duration check guards against matching on it alone.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "all-MiniLM-L6-v2",
+        threshold: float = 0.95,
+        min_duration_ratio: float = 0.9,
+        window_words: int = 150,
+        max_entries: int = 256,
+    ):
+        self.model_name = model_name
+        self.threshold = threshold
+        self.min_duration_ratio = min_duration_ratio
+        self.window_words = window_words
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._encoder_lock = threading.Lock()
+        self._notes_by_id: OrderedDict[str, str] = OrderedDict()
+        self._vectors: Optional[np.ndarray] = None
+        self._entries: list[tuple[str, str, float]] = []
+        self._encoder = None
+
+    def _get_encoder(self):
+        with self._encoder_lock:
+            if self._encoder is None:
+                from sentence_transformers import SentenceTransformer
+
+                self._encoder = SentenceTransformer(self.model_name)
+                logger.info(
+                    f"Loaded embedding model for semantic cache: {self.model_name}"
+                )
+        return self._encoder
+
+    def _encode(self, transcript: str) -> np.ndarray:
+        # The encoder truncates long inputs, so the transcript is embedded in
+        # fixed word windows and the normalized window vectors are mean-pooled.
+        words = transcript.split()
+        windows = [
+            " ".join(words[i : i + self.window_words])
+            for i in range(0, len(words), self.window_words)
+        ] or [""]
+
+        vectors = self._get_encoder().encode(
+            windows, normalize_embeddings=True, convert_to_numpy=True
+        )
+        embedding = vectors.mean(axis=0)
+        norm = np.linalg.norm(embedding)
+        if norm > 0:
+            embedding = embedding / norm
+        return embedding.astype(np.float32)
+
+    def get(self, video_id: str) -> Optional[str]:
+        """Look up notes by exact video ID.
+        Args:
+            video_id (str): The canonical video ID.
+        Returns:
+            Optional[str]: The cached notes, or None on a miss.
+        """
+        with self._lock:
+            notes = self._notes_by_id.get(video_id)
+            if notes is not None:
+                self._notes_by_id.move_to_end(video_id)
+        return notes
+
+    def get_similar(
+        self, transcript: str, duration: Optional[float], youtube_url: str
+    ) -> tuple[Optional[str], Optional[np.ndarray]]:
+        """Look up notes of a near-duplicate video.
+        Args:
+            transcript (str): The transcript of the current video.
+            duration (Optional[float]): Duration of the current video in seconds, if known.
+            youtube_url (str): URL of the current video; replaces the source URL in the returned notes.
+        Returns:
+            tuple[Optional[str], Optional[np.ndarray]]: The cached notes (None on a miss)
+            and the transcript embedding, which can be passed on to `put`.
+        """
+        try:
+            embedding = self._encode(transcript)
+        except Exception as e:
+            logger.error(f"Failed to embed transcript for semantic cache: {e}")
+            return None, None
+
+        if not duration:
+            return None, embedding
+
+        with self._lock:
+            if self._vectors is None:
+                return None, embedding
+
+            scores = self._vectors @ embedding
+            for index in np.argsort(scores)[::-1]:
+                if scores[index] < self.threshold:
+                    break
+
+                notes, source_url, source_duration = self._entries[index]
+                ratio = min(duration, source_duration) / max(duration, source_duration)
+                if ratio < self.min_duration_ratio:
+                    continue
+
+                logger.info(f"Semantic cache hit with similarity {scores[index]:.3f}")
+                return notes.replace(source_url, youtube_url), embedding
+
+        return None, embedding
+
+    def put(
+        self,
+        video_id: str,
+        notes: str,
+        embedding: Optional[np.ndarray] = None,
+        duration: Optional[float] = None,
+        youtube_url: Optional[str] = None,
+    ) -> None:
+        """Store notes under the video ID and, if given, the transcript embedding.
+        Args:
+            video_id (str): The canonical video ID.
+            notes (str): The generated markdown notes.
+            embedding (Optional[np.ndarray]): Normalized transcript embedding.
+            duration (Optional[float]): Duration of the video in seconds.
+            youtube_url (Optional[str]): URL the notes were generated for.
+        """
+        with self._lock:
+            self._notes_by_id[video_id] = notes
+            self._notes_by_id.move_to_end(video_id)
+            if len(self._notes_by_id) > self.max_entries:
+                self._notes_by_id.popitem(last=False)
+
+            if embedding is None or not duration or not youtube_url:
+                return
+
+            row = embedding.reshape(1, -1)
+            if self._vectors is None:
+                self._vectors = row
+            else:
+                self._vectors = np.vstack([self._vectors, row])
+            self._entries.append((notes, youtube_url, duration))
+
+            if len(self._entries) > self.max_entries:
+                self._vectors = self._vectors[1:]
+                self._entries.pop(0)
+
+
+notes_cache = SemanticCache()
@@ -0,0 +1,200 @@
+import logging
+import os
+from contextlib import contextmanager
+from typing import AsyncIterator, Awaitable, Callable, Iterator
+
+import httpx
+import orjson
+from app.utils.logger_setup import logger
+
+OLLAMA_URL = "http://localhost:11434/api/generate"
+
+# Model used for note generation, e.g. a quantized "llama3.1:8b-instruct-q4_K_M"
+OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3.1:latest")
+
+# Context window requested from Ollama and the most tokens generated per
+# response. Prompts must fit in the difference, or Ollama silently drops
+# their beginning; chapter and stitch budgets are derived from these.
+NUM_CTX = 8192
+NUM_PREDICT = 2048
+OPTIONS = {"num_ctx": NUM_CTX, "num_predict": NUM_PREDICT}
+
+# Idle connections are kept open between requests so that consecutive
+# calls to the local Ollama server reuse them instead of reconnecting.
+CLIENT = httpx.AsyncClient(
+    timeout=httpx.Timeout(300, connect=5),
+    limits=httpx.Limits(
+        max_connections=64,
+        max_keepalive_connections=32,
+        keepalive_expiry=300,
+    ),
+    headers={"Content-Type": "application/json"},
+)
+
+
+@contextmanager
+def map_ollama_errors(model: str) -> Iterator[None]:
+    """Log failures of a request to an Ollama model and re-raise them as RuntimeError.
+    Args:
+        model (str): The name of the Ollama model, used in the messages.
+    Raises:
+        RuntimeError: If the wrapped block raises.
+    """
+    try:
+        yield
+
+    except httpx.TimeoutException:
+        logger.error(f"Request to {model} timed out.")
+        raise RuntimeError(f"Request to {model} timed out.")
+
+    except httpx.HTTPError as e:
+        logger.error(f"Request to {model} failed: {e}")
+        raise RuntimeError(f"Request to {model} failed: {e}")
+
+    except ValueError as ve:
+        logger.error(f"Invalid response format: {ve}")
+        raise RuntimeError(f"Invalid response format: {ve}")
+
+    except Exception as e:
+        logger.exception(
+            f"Unexpected error occurred while communicating with {model}."
+        )
+        raise RuntimeError(f"An unexpected error occurred: {e}")
+
+
+def make_responder(model: str) -> Callable[[str], Awaitable[str]]:
+    """Create a function that generates a complete response from an Ollama model.
+    Args:
+        model (str): The name of the Ollama model, e.g. "llama3.1:latest".
+    Returns:
+        Callable[[str], Awaitable[str]]: An async function taking a prompt and returning the response text.
+    """
+    url = OLLAMA_URL
+    payload_template = {
+        "model": model,
+        "stream": False,
+        "keep_alive": -1,
+        "options": OPTIONS,
+    }
+
+    async def _call(prompt: str) -> str:
+        """Generate a response from the Ollama API using the provided prompt.
+        Args:
+            prompt (str): The input prompt for the model.
+        Returns:
+            str: The response text from the model.
+        Raises:
+            RuntimeError: If the request fails or the response is invalid.
+        """
+        payload = {**payload_template, "prompt": prompt}
+
+        logger.debug(
+            "Sending request to %s at %s with payload: %s", model, url, payload
+        )
+
+        with map_ollama_errors(model):
+            response = await CLIENT.post(url, content=orjson.dumps(payload))
+            response.raise_for_status()
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Received raw response: %s", response.text[:512])
+
+            data = orjson.loads(response.content)
+            response_text = data.get("response")
+
+            if not response_text:
+                logger.warning(f"Empty response received from {model}.")
+                raise ValueError("No response text found in the API response.")
+
+            logger.info(f"Successfully received response from {model}.")
+            return response_text.strip()
+
+    return _call
+
+
+def make_streamer(model: str) -> Callable[[str], AsyncIterator[str]]:
+    """Create a function that streams a response from an Ollama model token by token.
+    Args:
+        model (str): The name of the Ollama model, e.g. "llama3.1:latest".
+    Returns:
+        Callable[[str], AsyncIterator[str]]: An async generator function taking a prompt and yielding response chunks.
+    """
+    url = OLLAMA_URL
+    payload_template = {
+        "model": model,
+        "stream": True,
+        "keep_alive": -1,
+        "options": OPTIONS,
+    }
+
+    async def _stream(prompt: str) -> AsyncIterator[str]:
+        """Stream a response from the Ollama API token by token.
+        Args:
+            prompt (str): The input prompt for the model.
+        Yields:
+            str: Chunks of the response text as they are generated.
+        Raises:
+            RuntimeError: If the request fails or the response is invalid.
+        """
+        payload = {**payload_template, "prompt": prompt}
+
+        logger.debug(
+            "Sending streaming request to %s at %s with payload: %s",
+            model,
+            url,
+            payload,
+        )
+
+        with map_ollama_errors(model):
+            received_text = False
+            async with CLIENT.stream(
+                "POST", url, content=orjson.dumps(payload)
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+
+                    data = orjson.loads(line)
+                    if data.get("error"):
+                        raise ValueError(data["error"])
+
+                    chunk = data.get("response", "")
+                    if not received_text:
+                        chunk = chunk.lstrip()
+                    if chunk:
+                        received_text = True
+                        yield chunk
+
+                    if data.get("done"):
+                        break
+
+            if not received_text:
+                logger.warning(f"Empty response received from {model}.")
+                raise ValueError("No response text found in the API response.")
+
+            logger.info(f"Successfully streamed response from {model}.")
+
+    return _stream
+
+
+async def warm_up(model: str = OLLAMA_MODEL) -> None:
+    """Load the model into Ollama and keep it resident.
+
+    A request without a prompt only loads the model, so the first notes
+    request does not pay for it. Failures are logged but not raised.
+    Args:
+        model (str): The name of the Ollama model. Defaults to OLLAMA_MODEL.
+    """
+    logger.info(f"Warming up {model}...")
+    # The same num_ctx as the real requests, or Ollama reloads the model for them
+    payload = {"model": model, "keep_alive": -1, "options": OPTIONS}
+    try:
+        response = await CLIENT.post(OLLAMA_URL, content=orjson.dumps(payload))
+        response.raise_for_status()
+        logger.info(f"{model} is loaded and kept alive.")
+    except httpx.HTTPError as e:
+        logger.warning(f"Failed to warm up {model}: {e}")
+
+
+llama_response = make_responder(OLLAMA_MODEL)
+llama_response_stream = make_streamer(OLLAMA_MODEL)
@@ -1,30 +1,86 @@
+import functools
 import os
-import whisper
-import torch
+import threading
+from typing import Iterator, Optional
+
+import ctranslate2
+import numpy as np
+from faster_whisper import BatchedInferencePipeline, WhisperModel, decode_audio
 
 from app.utils.logger_setup import logger
 
-model = {
-    "tiny": whisper.load_model("tiny"),
-    "base.en": whisper.load_model("base.en"),
+use_cuda = ctranslate2.get_cuda_device_count() > 0
+device = "cuda" if use_cuda else "cpu"
+
+compute_types = {
+    "tiny": "int8",
+    "base.en": "int8_float16" if use_cuda else "int8",
 }
 
-logger.info("Whisper models loaded successfully.")
+# Sample rate expected by the Whisper feature extractor
+SAMPLE_RATE = 16000
+
 
+_model_lock = threading.Lock()
 
-def transcribe_audio(audio_path: str) -> str:
+
+def get_model(name: str) -> WhisperModel:
     """
-    Transcribe the given audio file to text.
+    Load a Whisper model on first use and keep it for the lifetime of the process.
+
+    Concurrent first calls wait for the same load instead of loading twice.
 
     Args:
-    - audio_path (str): Path to the audio file.
+    - name (str): Name of the Whisper model, e.g. "tiny" or "base.en".
 
     Returns:
-    - str: The transcribed text.
+    - WhisperModel: The loaded model.
+    """
+    with _model_lock:
+        return _load_model(name)
+
+
+@functools.cache
+def _load_model(name: str) -> WhisperModel:
+    logger.info(f"Loading Whisper model: {name}")
+    whisper_model = WhisperModel(
+        name, device=device, compute_type=compute_types.get(name, "int8")
+    )
+    logger.info(f"Whisper model loaded successfully: {name}")
+    return whisper_model
+
+
+def get_pipeline() -> BatchedInferencePipeline:
+    """
+    Return the batched transcription pipeline built on the base.en model.
+    """
+    with _model_lock:
+        return _load_pipeline()
+
+
+@functools.cache
+def _load_pipeline() -> BatchedInferencePipeline:
+    return BatchedInferencePipeline(model=_load_model("base.en"))
+
+
+def iter_transcript(audio_path: str, language: Optional[str] = None) -> Iterator[str]:
+    """
+    Transcribe the given audio file, yielding segment texts as they are decoded.
+
+    The file is decoded once and the same samples are used for both language
+    detection and transcription. The chunks are transcribed in parallel batches
+    by faster-whisper's BatchedInferencePipeline.
+
+    Args:
+    - audio_path (str): Path to the audio file.
+    - language (Optional[str]): Language code declared by the caller. Language detection is skipped when given.
+
+    Yields:
+    - str: The text of each transcribed segment.
 
     Raises:
     - FileNotFoundError: If the audio file is not found.
-    - ValueError: If the language detected is not English.
+    - ValueError: If the detected or declared language is not English.
     - RuntimeError: If transcription fails.
     """
     logger.info(f"Starting transcription for file: {audio_path}")
@@ -33,7 +89,18 @@ def transcribe_audio(audio_path: str) -> str:
         logger.error(f"File not found: {audio_path}")
         raise FileNotFoundError(f"File not found: {audio_path}")
 
-    detected_language = detect_language(audio_path)
+    try:
+        audio = decode_audio(audio_path, sampling_rate=SAMPLE_RATE)
+    except Exception as e:
+        logger.error(f"Failed to decode audio file {audio_path}: {str(e)}")
+        raise RuntimeError(f"Failed to decode audio: {e}")
+
+    if language is None:
+        detected_language = detect_language(audio)
+    else:
+        logger.info(f"Skipping language detection, declared language: {language}")
+        detected_language = language
+
     if detected_language != "en":
         logger.error(
             f"Unsupported language detected: {detected_language}. Only English is supported."
@@ -42,64 +109,46 @@ def transcribe_audio(audio_path: str) -> str:
             f"Unsupported language: {detected_language}. Only English is supported."
         )
 
-    use_fp16 = (
-        torch.cuda.is_available() and torch.cuda.get_device_capability()[0] >= 7.5
-    )
-
-    logger.info(f"Using FP16: {use_fp16}")
-
     try:
-        result = model["base.en"].transcribe(
-            audio_path,
+        segments, _ = get_pipeline().transcribe(
+            audio,
+            batch_size=16,
             language="en",
-            fp16=use_fp16,
         )
+        for segment in segments:
+            logger.debug("Transcribed segment: %s", segment.text)
+            yield segment.text
         logger.info(f"Transcription successful for file: {audio_path}")
-        logger.debug(f"Transcription result: {result['text']}")
-        return result["text"]
     except Exception as e:
         logger.error(f"Failed to transcribe audio: {str(e)}")
         raise RuntimeError(f"Failed to transcribe audio: {e}")
-    finally:
-        os.remove(audio_path)
-        logger.info(f"Audio file removed after transcription: {audio_path}")
 
 
-def detect_language(audio_path: str, sample_duration: float = 30.0) -> str:
+def detect_language(audio: np.ndarray, sample_duration: float = 30.0) -> str:
     """
-    Detect the language of the given audio file.
+    Detect the language of the given decoded audio.
 
     Args:
-    - audio_path (str): Path to the audio file.
+    - audio (np.ndarray): Mono float32 samples at SAMPLE_RATE, as returned by decode_audio.
     - sample_duration (float): Duration of the audio (in seconds) to sample for language detection. Default is 30 seconds.
 
     Returns:
     - str: The detected language code.
 
     Raises:
-    - FileNotFoundError: If the audio file is not found.
     - RuntimeError: If language detection fails.
     """
-    logger.info(f"Detecting language for file: {audio_path}")
+    logger.info("Detecting language...")
 
     try:
-        if not os.path.exists(audio_path):
-            logger.error(f"File not found: {audio_path}")
-            raise FileNotFoundError(f"File not found: {audio_path}")
-
-        full_audio = whisper.load_audio(audio_path)
-
-        sample_length = int(sample_duration * whisper.audio.SAMPLE_RATE)
-        sample_audio = full_audio[:sample_length]
-        sample_audio = whisper.pad_or_trim(sample_audio)
-
-        mel = whisper.log_mel_spectrogram(sample_audio).to(model["tiny"].device)
-        _, probs = model["tiny"].detect_language(mel)
-        language = max(probs, key=probs.get)
+        # Slicing the decoded samples is a view, not a copy; CTranslate2 moves
+        # the resulting features to the device once inside detect_language.
+        sample_length = int(sample_duration * SAMPLE_RATE)
+        language, _, _ = get_model("tiny").detect_language(audio[:sample_length])
 
-        logger.info(f"Detected language: {language} for file: {audio_path}")
+        logger.info(f"Detected language: {language}")
         return language
 
     except Exception as e:
-        logger.error(f"Failed to detect language for file {audio_path}: {str(e)}")
+        logger.error(f"Failed to detect language: {str(e)}")
         raise RuntimeError(f"Failed to detect language: {e}")
@@ -1,39 +1,298 @@
+import asyncio
+import re
+import tempfile
+import threading
+from contextlib import aclosing
+from typing import AsyncIterator, Optional
+
 from app.services.yt_dlp_service import download_youtube_audio
-from app.services.whisper_service import transcribe_audio
-from app.utils.prompt_generator import generate_prompt
-from app.services.llama_service import llama_response
+from app.services.whisper_service import iter_transcript
+from app.utils.prompt_generator import (
+    PROMPT_HEADER,
+    STITCH_PROMPT_HEADER,
+    generate_prompt,
+    generate_stitch_prompt,
+)
+from app.services.ollama_service import (
+    NUM_CTX,
+    NUM_PREDICT,
+    llama_response,
+    llama_response_stream,
+)
+from app.services.cache_service import get_video_id, notes_cache
 from app.utils.logger_setup import logger
 
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+def count_tokens(text: str) -> int:
+    """Approximate the number of LLM tokens in the text."""
+    return len(TOKEN_PATTERN.findall(text))
+
+
+# Prompt tokens available per request. Ollama drops the beginning of prompts
+# longer than NUM_CTX - NUM_PREDICT, and the regex tokenizer undercounts Llama
+# tokens, so only two thirds of that room is used.
+PROMPT_TOKENS = (NUM_CTX - NUM_PREDICT) * 2 // 3
+
+# Tokens of the previous chapter repeated at the start of the next one, and
+# room left for the references section
+CHAPTER_OVERLAP_TOKENS = 100
+REFERENCE_TOKENS = 64
+
+# Transcript tokens that fit in one chapter prompt. Chapters are closed at
+# CHAPTER_TOKENS; a shorter tail than MIN_CHAPTER_TOKENS is merged into the
+# last chapter instead of becoming its own, keeping chapters near the budget.
+CHAPTER_BUDGET = (
+    PROMPT_TOKENS
+    - count_tokens(PROMPT_HEADER)
+    - CHAPTER_OVERLAP_TOKENS
+    - REFERENCE_TOKENS
+)
+CHAPTER_TOKENS = CHAPTER_BUDGET * 4 // 5
+MIN_CHAPTER_TOKENS = CHAPTER_BUDGET - CHAPTER_TOKENS
+
+# Chapter notes tokens that fit in one stitch prompt
+STITCH_BUDGET = PROMPT_TOKENS - count_tokens(STITCH_PROMPT_HEADER) - REFERENCE_TOKENS
+
+
+def with_overlap(previous: str, chapter: str) -> str:
+    """Prefix a chapter with the last CHAPTER_OVERLAP_TOKENS tokens of the previous one.
+    Args:
+        previous (str): The previous chapter, or an empty string for the first chapter.
+        chapter (str): The chapter to prefix.
+    Returns:
+        str: The chapter text with the overlapping context in front.
+    """
+    tokens = list(TOKEN_PATTERN.finditer(previous))
+    if not tokens:
+        return chapter
+    start = tokens[max(len(tokens) - CHAPTER_OVERLAP_TOKENS, 0)].start()
+    return previous[start:] + " " + chapter
+
+
+async def transcribe_chapters(
+    audio_path: str, language: Optional[str] = None
+) -> AsyncIterator[tuple[str, bool]]:
+    """Transcribe audio in a worker thread, yielding chapter-sized transcript chunks.
+    Args:
+        audio_path (str): Path to the audio file.
+        language (Optional[str]): Declared language code; skips language detection when given.
+    Yields:
+        tuple[str, bool]: About CHAPTER_TOKENS tokens of transcript ending on a segment
+        boundary, and whether it is the last chapter. A chapter is yielded once the
+        next one is complete, so that a short tail can be merged into it.
+    Raises:
+        FileNotFoundError, ValueError, RuntimeError: As raised by the transcription.
+    """
+    loop = asyncio.get_running_loop()
+    segments: asyncio.Queue = asyncio.Queue()
+    stop = threading.Event()
+
+    def produce() -> None:
+        try:
+            for text in iter_transcript(audio_path, language):
+                if stop.is_set():
+                    break
+                loop.call_soon_threadsafe(segments.put_nowait, text)
+        finally:
+            loop.call_soon_threadsafe(segments.put_nowait, None)
+
+    producer = asyncio.create_task(asyncio.to_thread(produce))
+
+    try:
+        pending = None
+        buffer = []
+        token_count = 0
+        while (text := await segments.get()) is not None:
+            buffer.append(text)
+            token_count += count_tokens(text)
+            if token_count >= CHAPTER_TOKENS:
+                if pending is not None:
+                    yield pending, False
+                pending = "".join(buffer).strip()
+                buffer = []
+                token_count = 0
+
+        # Re-raise any transcription error
+        await producer
+
+        tail = "".join(buffer).strip()
+        if pending is None:
+            if tail:
+                yield tail, True
+        elif tail and token_count >= MIN_CHAPTER_TOKENS:
+            yield pending, False
+            yield tail, True
+        else:
+            yield f"{pending} {tail}".strip(), True
+    finally:
+        # Stop transcribing once the consumer is gone
+        stop.set()
+        if not producer.done():
+            producer.cancel()
+        elif not producer.cancelled():
+            # Mark an unawaited failure as retrieved
+            producer.exception()
+
 
-def generate_md_notes(youtube_url: str) -> str:
+def group_notes(notes: list[str], budget: int) -> list[list[str]]:
+    """Pack consecutive notes into groups that fit in one stitch prompt.
+
+    Every group but a trailing one holds at least two notes, so merging each
+    group shortens the list even when single notes are close to the budget.
+    Args:
+        notes (list[str]): The notes to group, in order.
+        budget (int): Maximum number of tokens per group.
+    Returns:
+        list[list[str]]: The groups, in order.
+    """
+    groups = []
+    group = []
+    group_tokens = 0
+    for note in notes:
+        note_tokens = count_tokens(note)
+        if len(group) >= 2 and group_tokens + note_tokens > budget:
+            groups.append(group)
+            group = []
+            group_tokens = 0
+        group.append(note)
+        group_tokens += note_tokens
+    if group:
+        groups.append(group)
+    return groups
+
+
+async def reduce_notes(notes: list[str], youtube_url: str) -> list[str]:
+    """Merge chapter notes in rounds until all of them fit in one stitch prompt.
+    Args:
+        notes (list[str]): The chapter notes, in order.
+        youtube_url (str): The URL of the YouTube video, used as a reference.
+    Returns:
+        list[str]: Notes whose combined size fits in STITCH_BUDGET.
+    """
+
+    async def merge(group: list[str]) -> str:
+        if len(group) == 1:
+            return group[0]
+        return await llama_response(
+            generate_stitch_prompt(group, references=[youtube_url])
+        )
+
+    while len(notes) > 1 and sum(map(count_tokens, notes)) > STITCH_BUDGET:
+        groups = group_notes(notes, STITCH_BUDGET)
+        logger.info(f"Merging {len(notes)} notes in {len(groups)} groups.")
+        notes = await asyncio.gather(*(merge(group) for group in groups))
+    return notes
+
+
+async def generate_md_notes_stream(
+    youtube_url: str, language: Optional[str] = None
+) -> AsyncIterator[str]:
     logger.info(f"Starting markdown notes generation for URL: {youtube_url}")
     try:
-        # Step 1: Download audio
-        logger.debug("Downloading audio from YouTube...")
-        audio_path = download_youtube_audio(youtube_url)
-        logger.info(f"Audio downloaded to: {audio_path}")
-
-        # Step 2: Transcribe audio
-        logger.debug("Transcribing audio...")
-        transcript = transcribe_audio(audio_path)
-        logger.info("Transcription completed.")
-
-        # Step 3: Generate prompt
-        logger.debug("Generating prompt for Llama3...")
-        prompt = generate_prompt(transcript, references=[youtube_url])
-        logger.info("Prompt generated.")
-
-        # Step 4: Get response from Llama3
-        logger.debug("Getting response from Llama3...")
-        markdown_notes = llama_response(prompt)
+        # Step 0: Check the cache by video ID
+        video_id = get_video_id(youtube_url)
+        cached_notes = notes_cache.get(video_id)
+        if cached_notes is not None:
+            logger.info(f"Cache hit for video ID: {video_id}")
+            yield cached_notes
+            return
+
+        chapters = []
+        chapter_tasks = []
+        embedding = None
+
+        def chapter_prompt(index: int) -> str:
+            previous = chapters[index - 1] if index else ""
+            return generate_prompt(
+                with_overlap(previous, chapters[index]), references=[youtube_url]
+            )
+
+        try:
+            # The audio only lives as long as this per-request directory
+            with tempfile.TemporaryDirectory(prefix="lexify-") as tmp_dir:
+                # Step 1: Download audio
+                logger.debug("Downloading audio from YouTube...")
+                audio_path, duration = await asyncio.to_thread(
+                    download_youtube_audio, youtube_url, tmp_dir
+                )
+                logger.info(f"Audio downloaded to: {audio_path}")
+
+                # Step 2: Transcribe audio, starting Llama3 on each finished
+                # chapter while the following ones are still being transcribed
+                logger.debug("Transcribing audio...")
+                async with aclosing(
+                    transcribe_chapters(audio_path, language)
+                ) as chapter_stream:
+                    async for chapter, is_last in chapter_stream:
+                        if not chapters:
+                            # Step 2.5: Check the cache for a near-duplicate
+                            # video before any Llama3 work is started
+                            cached_notes, embedding = await asyncio.to_thread(
+                                notes_cache.get_similar, chapter, duration, youtube_url
+                            )
+                            if cached_notes is not None:
+                                logger.info(
+                                    f"Semantic cache hit for video ID: {video_id}"
+                                )
+                                yield cached_notes
+                                return
+
+                        chapters.append(chapter)
+                        if is_last and len(chapters) == 1:
+                            break
+
+                        chapter_tasks.append(
+                            asyncio.create_task(
+                                llama_response(chapter_prompt(len(chapters) - 1))
+                            )
+                        )
+                        logger.debug("Dispatched chapter %d to Llama3.", len(chapters))
+            transcript = " ".join(chapters)
+            logger.info(f"Transcription completed in {len(chapters)} chapter(s).")
+
+            chunks = []
+            if not chapter_tasks:
+                # Step 3: Generate prompt
+                logger.debug("Generating prompt for Llama3...")
+                prompt = generate_prompt(transcript, references=[youtube_url])
+                logger.info("Prompt generated.")
+
+                # Step 4: Stream response from Llama3
+                logger.debug("Streaming response from Llama3...")
+                async for chunk in llama_response_stream(prompt):
+                    chunks.append(chunk)
+                    yield chunk
+            else:
+                # Step 3: Collect the per-chapter notes
+                logger.debug("Waiting for chapter notes from Llama3...")
+                chapter_notes = await asyncio.gather(*chapter_tasks)
+                logger.info(f"Received notes for {len(chapter_notes)} chapters.")
+                chapter_notes = await reduce_notes(chapter_notes, youtube_url)
+
+                # Step 4: Stream the merged notes from Llama3
+                logger.debug("Streaming merged notes from Llama3...")
+                prompt = generate_stitch_prompt(
+                    chapter_notes, references=[youtube_url]
+                )
+                async for chunk in llama_response_stream(prompt):
+                    chunks.append(chunk)
+                    yield chunk
+        finally:
+            for task in chapter_tasks:
+                task.cancel()
+
+        markdown_notes = "".join(chunks)
         logger.info("Received response from Llama3.")
 
+        notes_cache.put(video_id, markdown_notes, embedding, duration, youtube_url)
+
         # Step 5: Write to file
         # logger.debug("Writing markdown notes to file...")
         # _, file_name = write_to_file(markdown_notes, file_ext="md")
         # logger.info(f"Markdown notes written to file: {file_name}")
 
-        return markdown_notes
     except Exception as e:
         logger.error(f"Error generating markdown notes: {e}", exc_info=True)
         raise
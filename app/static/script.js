@@ -276,10 +276,25 @@ class UIManager {
                 throw new Error(errorData.message || `HTTP ${response.status}: ${response.statusText}`);
             }
 
-            const data = await response.json();
+            // Notes are streamed as raw markdown; render them as they arrive
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let content = '';
+
+            while (true) {
+                const { done, value } = await reader.read();
+                if (done) break;
+
+                content += decoder.decode(value, { stream: true });
+                this.appState.setState({
+                    content,
+                    current: 'content'
+                });
+            }
+            content += decoder.decode();
 
             this.appState.setState({
-                content: data.md_notes || '',
+                content,
                 current: 'content',
                 isLoading: false
             });
@@ -1,5 +1,8 @@
+import atexit
 import logging
 import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
 
 
 def setup_logger(name: str = "app", level: int = logging.INFO) -> logging.Logger:
@@ -25,8 +28,15 @@ def setup_logger(name: str = "app", level: int = logging.INFO) -> logging.Logger
         file_handler.setFormatter(formatter)
         console_handler.setFormatter(formatter)
 
-        logger.addHandler(file_handler)
-        logger.addHandler(console_handler)
+        # Callers only enqueue records; a background thread does the writes.
+        log_queue = queue.SimpleQueue()
+        logger.addHandler(QueueHandler(log_queue))
+
+        listener = QueueListener(
+            log_queue, file_handler, console_handler, respect_handler_level=True
+        )
+        listener.start()
+        atexit.register(listener.stop)
 
     return logger
 
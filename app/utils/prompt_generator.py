@@ -1,14 +1,4 @@
-def generate_prompt(text: str, keywords: list = [], references: list = []) -> str:
-    """Generates a structured prompt for converting a YouTube video transcript or summary into a Markdown document.
-    Args:
-        text (str): The transcript or summary text from the YouTube video.
-        keywords (list, optional): A list of keywords to include in the document. Defaults to an empty list.
-        references (list, optional): A list of references to include in the document. Defaults to an empty list.
-    Returns:
-        str: A formatted prompt string ready for use in a Markdown conversion task.
-    """
-    prompt = f"""
-You are an expert technical writer. You will be given a transcript or summary from a YouTube video. Your task is to convert it into a clean, logically organized, and well-formatted Markdown document (`notes.md`).
+PROMPT_HEADER = """You are an expert technical writer. You will be given a transcript or summary from a YouTube video. Your task is to convert it into a clean, logically organized, and well-formatted Markdown document (`notes.md`).
 
 ## Note:
 - Use the text to generate the document.
@@ -46,11 +36,53 @@ You are an expert technical writer. You will be given a transcript or summary fr
 - Where possible, infer or group related ideas into logical sections.
 
 ## Input Text:
-{text.strip()}
 """
+
+STITCH_PROMPT_HEADER = """You are an expert technical writer. You will be given Markdown notes that were written separately for consecutive parts of one YouTube video. Your task is to merge them into a single clean, logically organized, and well-formatted Markdown document (`notes.md`).
+
+## Instructions:
+- Use a single **title** and one table of contents for the whole document.
+- Merge chapters and sections that cover the same topic, and remove content repeated across parts.
+- Keep the order in which topics appear in the video.
+- Keep code blocks, equations, tables, and diagrams from the parts unchanged.
+- Place the references under a proper section if provided.
+
+## Notes:
+"""
+
+
+def generate_prompt(text: str, keywords: list = [], references: list = []) -> str:
+    """Generates a structured prompt for converting a YouTube video transcript or summary into a Markdown document.
+    Args:
+        text (str): The transcript or summary text from the YouTube video, already stripped of surrounding whitespace.
+        keywords (list, optional): A list of keywords to include in the document. Defaults to an empty list.
+        references (list, optional): A list of references to include in the document. Defaults to an empty list.
+    Returns:
+        str: A formatted prompt string ready for use in a Markdown conversion task.
+    """
+    sections = [PROMPT_HEADER, text, "\n"]
     if keywords:
-        prompt += f"\n\n## Keywords:\n- {', '.join(keywords)}"
+        sections.append(f"\n\n## Keywords:\n- {', '.join(keywords)}")
+    if references:
+        sections.append("\n\n## References:\n- " + "\n- ".join(references))
+    if keywords or references:
+        sections.append("\n")
+
+    return "".join(sections)
+
+
+def generate_stitch_prompt(sections: list, references: list = []) -> str:
+    """Generates a prompt for merging the notes of consecutive transcript chunks into one Markdown document.
+    Args:
+        sections (list): The Markdown notes of each chunk, in order.
+        references (list, optional): A list of references to include in the document. Defaults to an empty list.
+    Returns:
+        str: A formatted prompt string ready for use in a Markdown merging task.
+    """
+    parts = [STITCH_PROMPT_HEADER]
+    for index, section in enumerate(sections, start=1):
+        parts.append(f"\n### Part {index}\n\n{section.strip()}\n")
     if references:
-        prompt += f"\n\n## References:\n- " + "\n- ".join(references)
+        parts.append("\n\n## References:\n- " + "\n- ".join(references) + "\n")
 
-    return prompt.strip() + "\n"
+    return "".join(parts)
@@ -0,0 +1,115 @@
+import numpy as np
+import pytest
+
+from app.services.cache_service import SemanticCache, get_video_id
+
+
+class FakeEncoder:
+    """Maps each window of text to a fixed unit vector."""
+
+    def __init__(self, vectors: dict):
+        self.vectors = vectors
+        self.calls = []
+
+    def encode(self, windows, normalize_embeddings, convert_to_numpy):
+        self.calls.append(list(windows))
+        rows = [np.asarray(self.vectors[w], dtype=np.float32) for w in windows]
+        return np.vstack([row / np.linalg.norm(row) for row in rows])
+
+
+def make_cache(vectors: dict, **kwargs) -> SemanticCache:
+    cache = SemanticCache(**kwargs)
+    cache._encoder = FakeEncoder(vectors)
+    return cache
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+        "https://youtube.com/watch?v=dQw4w9WgXcQ&list=PL123&t=42",
+        "https://m.youtube.com/watch?feature=share&v=dQw4w9WgXcQ",
+        "https://youtu.be/dQw4w9WgXcQ?t=10",
+        "https://www.youtube.com/embed/dQw4w9WgXcQ",
+        "https://www.youtube.com/shorts/dQw4w9WgXcQ",
+        "https://www.youtube.com/v/dQw4w9WgXcQ",
+        "  https://www.youtube.com/live/dQw4w9WgXcQ  ",
+    ],
+)
+def test_get_video_id_parses_known_url_forms(url):
+    assert get_video_id(url) == "dQw4w9WgXcQ"
+
+
+def test_get_video_id_falls_back_to_url():
+    assert get_video_id(" https://example.com/video ") == "https://example.com/video"
+
+
+def test_get_evicts_least_recently_used():
+    cache = SemanticCache(max_entries=2)
+    cache.put("a", "notes a")
+    cache.put("b", "notes b")
+    assert cache.get("a") == "notes a"
+
+    cache.put("c", "notes c")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "notes a"
+    assert cache.get("c") == "notes c"
+
+
+def test_get_similar_hit_rewrites_source_url():
+    cache = make_cache({"old talk": [1.0, 0.0], "new talk": [0.99, 0.05]})
+    notes = "# Notes\n- https://youtu.be/old"
+    cache.put("old", notes, cache._encode("old talk"), 600.0, "https://youtu.be/old")
+
+    notes, _ = cache.get_similar("new talk", 610.0, "https://youtu.be/new")
+
+    assert notes == "# Notes\n- https://youtu.be/new"
+
+
+def test_get_similar_below_threshold_misses():
+    cache = make_cache({"old talk": [1.0, 0.0], "other talk": [0.7, 0.7]})
+    cache.put("old", "notes", cache._encode("old talk"), 600.0, "https://youtu.be/old")
+
+    notes, embedding = cache.get_similar("other talk", 600.0, "https://youtu.be/new")
+
+    assert notes is None
+    assert embedding is not None
+
+
+def test_get_similar_rejects_different_duration():
+    cache = make_cache({"old talk": [1.0, 0.0], "new talk": [1.0, 0.0]})
+    cache.put("old", "notes", cache._encode("old talk"), 600.0, "https://youtu.be/old")
+
+    notes, _ = cache.get_similar("new talk", 300.0, "https://youtu.be/new")
+
+    assert notes is None
+
+
+def test_get_similar_without_duration_misses():
+    cache = make_cache({"old talk": [1.0, 0.0], "new talk": [1.0, 0.0]})
+    cache.put("old", "notes", cache._encode("old talk"), 600.0, "https://youtu.be/old")
+
+    notes, _ = cache.get_similar("new talk", None, "https://youtu.be/new")
+
+    assert notes is None
+
+
+def test_semantic_entries_are_bounded():
+    cache = make_cache({"a": [1.0, 0.0], "b": [0.0, 1.0]}, max_entries=1)
+    cache.put("a", "notes a", cache._encode("a"), 60.0, "https://youtu.be/a")
+    cache.put("b", "notes b", cache._encode("b"), 60.0, "https://youtu.be/b")
+
+    notes, _ = cache.get_similar("a", 60.0, "https://youtu.be/x")
+
+    assert notes is None
+    assert cache._vectors.shape[0] == 1
+
+
+def test_encode_mean_pools_word_windows():
+    cache = make_cache({"one two": [1.0, 0.0], "three": [0.0, 1.0]}, window_words=2)
+
+    embedding = cache._encode("one two three")
+
+    assert cache._encoder.calls == [["one two", "three"]]
+    np.testing.assert_allclose(embedding, [np.sqrt(0.5), np.sqrt(0.5)], rtol=1e-6)
@@ -0,0 +1,22 @@
+import pytest
+from pydantic import ValidationError
+
+from app.models.youtube import YouTubeURL
+
+URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+
+def test_language_defaults_to_none():
+    assert YouTubeURL(url=URL).language is None
+    assert YouTubeURL(url=URL, language=None).language is None
+
+
+@pytest.mark.parametrize("language", ["en", "EN", " en ", "EN-us", "en_GB"])
+def test_language_is_normalized_to_primary_subtag(language):
+    assert YouTubeURL(url=URL, language=language).language == "en"
+
+
+@pytest.mark.parametrize("language", ["fr", "fr-CA", "", "eng", 1, ["en"]])
+def test_language_rejects_unsupported_values(language):
+    with pytest.raises(ValidationError):
+        YouTubeURL(url=URL, language=language)
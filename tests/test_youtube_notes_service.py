@@ -0,0 +1,148 @@
+import asyncio
+
+import pytest
+
+from app.services import youtube_notes_service as notes_service
+from app.services.youtube_notes_service import (
+    CHAPTER_OVERLAP_TOKENS,
+    CHAPTER_TOKENS,
+    MIN_CHAPTER_TOKENS,
+    STITCH_BUDGET,
+    count_tokens,
+    group_notes,
+    reduce_notes,
+    transcribe_chapters,
+    with_overlap,
+)
+
+
+def words(count: int, word: str = "w") -> str:
+    """A transcript segment of `count` tokens, with the leading space Whisper emits."""
+    return " " + " ".join([word] * count)
+
+
+def collect_chapters(monkeypatch, segments: list[str]) -> list[tuple[str, bool]]:
+    def fake_iter_transcript(audio_path, language=None):
+        yield from segments
+
+    monkeypatch.setattr(notes_service, "iter_transcript", fake_iter_transcript)
+
+    async def collect():
+        return [chapter async for chapter in transcribe_chapters("audio.m4a")]
+
+    return asyncio.run(collect())
+
+
+def test_with_overlap_returns_first_chapter_unchanged():
+    assert with_overlap("", "first chapter") == "first chapter"
+
+
+def test_with_overlap_prefixes_last_overlap_tokens_of_previous():
+    previous = words(50, "a") + words(CHAPTER_OVERLAP_TOKENS, "b")
+    result = with_overlap(previous.strip(), "next")
+
+    prefix, _, chapter = result.rpartition(" ")
+    assert chapter == "next"
+    assert prefix.split() == ["b"] * CHAPTER_OVERLAP_TOKENS
+
+
+def test_with_overlap_keeps_short_previous_whole():
+    assert with_overlap("short previous.", "next") == "short previous. next"
+
+
+def test_transcribe_chapters_empty_transcript_yields_nothing(monkeypatch):
+    assert collect_chapters(monkeypatch, []) == []
+
+
+def test_transcribe_chapters_short_transcript_is_single_last_chapter(monkeypatch):
+    chapters = collect_chapters(monkeypatch, [words(10), words(20)])
+
+    assert len(chapters) == 1
+    chapter, is_last = chapters[0]
+    assert is_last
+    assert count_tokens(chapter) == 30
+
+
+def test_transcribe_chapters_exact_boundary_has_no_empty_tail(monkeypatch):
+    segments = [words(CHAPTER_TOKENS // 2), words(CHAPTER_TOKENS - CHAPTER_TOKENS // 2)]
+    chapters = collect_chapters(monkeypatch, segments * 2)
+
+    assert [is_last for _, is_last in chapters] == [False, True]
+    assert [count_tokens(chapter) for chapter, _ in chapters] == [CHAPTER_TOKENS] * 2
+
+
+def test_transcribe_chapters_merges_short_tail_into_last_chapter(monkeypatch):
+    tail = MIN_CHAPTER_TOKENS - 1
+    chapters = collect_chapters(monkeypatch, [words(CHAPTER_TOKENS), words(tail)])
+
+    assert len(chapters) == 1
+    chapter, is_last = chapters[0]
+    assert is_last
+    assert count_tokens(chapter) == CHAPTER_TOKENS + tail
+
+
+def test_transcribe_chapters_keeps_long_tail_as_own_chapter(monkeypatch):
+    segments = [words(CHAPTER_TOKENS), words(CHAPTER_TOKENS), words(MIN_CHAPTER_TOKENS)]
+    chapters = collect_chapters(monkeypatch, segments)
+
+    assert [is_last for _, is_last in chapters] == [False, False, True]
+    assert [count_tokens(chapter) for chapter, _ in chapters] == [
+        CHAPTER_TOKENS,
+        CHAPTER_TOKENS,
+        MIN_CHAPTER_TOKENS,
+    ]
+
+
+def test_transcribe_chapters_reraises_transcription_errors(monkeypatch):
+    def failing_iter_transcript(audio_path, language=None):
+        yield words(10)
+        raise ValueError("Unsupported language")
+
+    monkeypatch.setattr(notes_service, "iter_transcript", failing_iter_transcript)
+
+    async def collect():
+        return [chapter async for chapter in transcribe_chapters("audio.m4a")]
+
+    with pytest.raises(ValueError, match="Unsupported language"):
+        asyncio.run(collect())
+
+
+def test_group_notes_packs_small_notes_within_budget():
+    notes = [words(100)] * 5
+    assert [len(group) for group in group_notes(notes, 250)] == [2, 2, 1]
+
+
+def test_group_notes_pairs_notes_larger_than_budget():
+    notes = [words(300)] * 5
+    groups = group_notes(notes, 250)
+
+    assert [len(group) for group in groups] == [2, 2, 1]
+    assert [note for group in groups for note in group] == notes
+
+
+def test_reduce_notes_skips_llm_when_notes_fit(monkeypatch):
+    async def fake_llama_response(prompt):
+        raise AssertionError("Llama3 should not be called")
+
+    monkeypatch.setattr(notes_service, "llama_response", fake_llama_response)
+    notes = [words(100), words(100)]
+
+    assert asyncio.run(reduce_notes(notes, "https://youtu.be/abc")) == notes
+
+
+def test_reduce_notes_merges_until_notes_fit(monkeypatch):
+    prompts = []
+
+    async def fake_llama_response(prompt):
+        prompts.append(prompt)
+        return words(STITCH_BUDGET // 2)
+
+    monkeypatch.setattr(notes_service, "llama_response", fake_llama_response)
+    notes = [words(STITCH_BUDGET // 2)] * 7
+
+    reduced = asyncio.run(reduce_notes(notes, "https://youtu.be/abc"))
+
+    assert sum(map(count_tokens, reduced)) <= STITCH_BUDGET
+    assert len(reduced) < len(notes)
+    assert prompts
+    assert all("https://youtu.be/abc" in prompt for prompt in prompts)